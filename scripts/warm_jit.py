@@ -0,0 +1,18 @@
+"""
+Pre-compile the numba kernels in src.processes.
+
+The kernels use @njit(cache=True), so compiling them once here populates
+the on-disk cache and later CLI sessions load machine code instead of
+paying multi-second JIT latency on first use. Run from the repo root:
+
+    python scripts/warm_jit.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ['THERMO_WARM_JIT'] = '1'
+
+import src.processes  # noqa: F401  (importing triggers the warm-up calls)
+
+print("numba kernel cache warmed")
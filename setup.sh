@@ -20,6 +20,9 @@ source venv/bin/activate
 pip install --upgrade pip
 pip install -r requirements.txt
 
+echo "🔥 Warming numba kernel cache..."
+python scripts/warm_jit.py
+
 echo ""
 echo "✅ Setup complete!"
 echo ""
@@ -2,9 +2,35 @@
 Command-line interface for the thermodynamic calculator.
 """
 import click
-from src.properties import PropertyCalculator
-from src.processes import ProcessAnalyzer
-from tabulate import tabulate
+
+# src.properties / src.processes (and through them CoolProp, numpy and
+# numba) are imported inside each command: their import cost dominates
+# cold start for invocations that never need them (e.g. --help).
+
+_BATCH_HEADERS = ['T (C)', 'P (kPa)', 'h (kJ/kg)', 's (kJ/kg-K)',
+                  'v (m³/kg)', 'rho (kg/m³)', 'u (kJ/kg)']
+
+def _batch_table(props):
+    """Format a get_properties_batch result dict as one row per state."""
+    rows = zip(props['temperature'], props['pressure'], props['enthalpy'],
+               props['entropy'], props['specific_volume'], props['density'],
+               props['internal_energy'])
+    return [[f"{t:.2f}", f"{p:.2f}", f"{h:.2f}", f"{s:.4f}",
+             f"{v:.6f}", f"{d:.2f}", f"{u:.2f}"]
+            for t, p, h, s, v, d, u in rows]
+
+# Display template for property tables: label, dict key, format, unit.
+# Rows with a None value (e.g. quality in single phase) are skipped.
+_PROPERTY_ROW_SPEC = (
+    ('Temperature', 'temperature', '{:.2f}', 'C'),
+    ('Pressure', 'pressure', '{:.2f}', 'kPa'),
+    ('Enthalpy', 'enthalpy', '{:.2f}', 'kJ/kg'),
+    ('Entropy', 'entropy', '{:.4f}', 'kJ/kg-K'),
+    ('Specific Volume', 'specific_volume', '{:.6f}', 'm³/kg'),
+    ('Density', 'density', '{:.2f}', 'kg/m³'),
+    ('Internal Energy', 'internal_energy', '{:.2f}', 'kJ/kg'),
+    ('Quality', 'quality', '{:.4f}', '-'),
+)
 
 @click.group()
 def cli():
@@ -20,40 +46,42 @@ def cli():
 @click.option('--entropy', type=float, help='Entropy (kJ/kg-K)')
 def property(fluid, temp, pressure, quality, enthalpy, entropy):
     """Calculate thermodynamic properties"""
+    from src.properties import SUPPORTED_INPUT_SETS, get_calculator
+    from tabulate import tabulate
+
+    # Build kwargs from provided options and validate the combination
+    # before entering CoolProp
+    kwargs = {}
+    if temp is not None:
+        kwargs['temp'] = temp
+    if pressure is not None:
+        kwargs['pressure'] = pressure
+    if quality is not None:
+        kwargs['quality'] = quality
+    if enthalpy is not None:
+        kwargs['enthalpy'] = enthalpy
+    if entropy is not None:
+        kwargs['entropy'] = entropy
+
+    if frozenset(kwargs) not in SUPPORTED_INPUT_SETS:
+        raise click.BadParameter(
+            "Provide two independent properties: temp+pressure, temp+quality, "
+            "pressure+enthalpy, pressure+entropy, or enthalpy+entropy")
+
     try:
-        calc = PropertyCalculator(fluid)
-        
-        # Build kwargs from provided options
-        kwargs = {}
-        if temp is not None:
-            kwargs['temp'] = temp
-        if pressure is not None:
-            kwargs['pressure'] = pressure
-        if quality is not None:
-            kwargs['quality'] = quality
-        if enthalpy is not None:
-            kwargs['enthalpy'] = enthalpy
-        if entropy is not None:
-            kwargs['entropy'] = entropy
-        
+        calc = get_calculator(fluid)
         props = calc.get_properties(**kwargs)
         
         # Display results
-        table = []
-        table.append(['Temperature', f"{props['temperature']:.2f}", 'C'])
-        table.append(['Pressure', f"{props['pressure']:.2f}", 'kPa'])
-        table.append(['Enthalpy', f"{props['enthalpy']:.2f}", 'kJ/kg'])
-        table.append(['Entropy', f"{props['entropy']:.4f}", 'kJ/kg-K'])
-        table.append(['Specific Volume', f"{props['specific_volume']:.6f}", 'm³/kg'])
-        table.append(['Density', f"{props['density']:.2f}", 'kg/m³'])
-        table.append(['Internal Energy', f"{props['internal_energy']:.2f}", 'kJ/kg'])
-        if props['quality'] is not None:
-            table.append(['Quality', f"{props['quality']:.4f}", '-'])
-        
-        click.echo(f"\n{fluid.upper()} Properties:")
+        table = [[label, fmt.format(props[key]), unit]
+                 for label, key, fmt, unit in _PROPERTY_ROW_SPEC
+                 if props.get(key) is not None]
+
+
+        click.echo(f"\n{calc.display_name} Properties:")
         click.echo(tabulate(table, headers=['Property', 'Value', 'Unit'], tablefmt='grid'))
         
-    except Exception as e:
+    except (ValueError, RuntimeError) as e:
         click.echo(f"Error: {str(e)}", err=True)
 
 @cli.command()
@@ -64,6 +92,11 @@ def property(fluid, temp, pressure, quality, enthalpy, entropy):
 @click.option('--efficiency', type=float, default=1.0)
 def process(fluid, inlet_temp, inlet_pressure, outlet_pressure, efficiency):
     """Analyze isentropic process"""
+    from src.processes import ProcessAnalyzer
+
+    if not 0 < efficiency <= 1:
+        raise click.BadParameter("Isentropic efficiency must be in (0, 1]")
+
     try:
         analyzer = ProcessAnalyzer(fluid)
         
@@ -79,32 +112,80 @@ def process(fluid, inlet_temp, inlet_pressure, outlet_pressure, efficiency):
         click.echo(f"Outlet Temperature (actual): {result['outlet_actual']['temperature']:.2f} C")
         click.echo(f"Outlet Temperature (isentropic): {result['outlet_isentropic']['temperature']:.2f} C")
         
-    except Exception as e:
+    except (ValueError, RuntimeError) as e:
+        click.echo(f"Error: {str(e)}", err=True)
+
+@cli.command('batch-property')
+@click.option('--fluid', required=True, help='Fluid: water, air, r134a, r22, co2')
+@click.option('--input-csv', 'input_csv', required=True, type=click.Path(exists=True),
+              help='CSV file with temperature (C), pressure (kPa) columns')
+def batch_property(fluid, input_csv):
+    """Calculate properties for many states from a CSV file"""
+    import numpy as np
+    from src.properties import get_calculator
+    from tabulate import tabulate
+    try:
+        data = np.loadtxt(input_csv, delimiter=',', ndmin=2)
+        if data.shape[1] != 2:
+            raise ValueError("Input CSV must have two columns: temperature (C), pressure (kPa)")
+
+        calc = get_calculator(fluid)
+        props = calc.get_properties_batch(data[:, 0], data[:, 1])
+        table = _batch_table(props)
+
+        click.echo(f"\n{calc.display_name} Properties ({len(table)} states):")
+        click.echo(tabulate(table, headers=_BATCH_HEADERS, tablefmt='grid'))
+
+    except (ValueError, RuntimeError) as e:
         click.echo(f"Error: {str(e)}", err=True)
 
 @cli.command()
-def interactive():
+@click.option('--input-csv', 'input_csv', type=click.Path(exists=True), default=None,
+              help='Read temperature (C), pressure (kPa) pairs from a CSV instead of prompting')
+def interactive(input_csv):
     """Interactive mode for property calculations"""
+    import numpy as np
+    from src.properties import get_calculator
+    from tabulate import tabulate
+
     click.echo("\n=== Thermodynamic Calculator - Interactive Mode ===\n")
-    
+
     fluid = click.prompt('Select fluid', type=click.Choice(['water', 'air', 'r134a', 'r22', 'co2']))
-    temp = click.prompt('Temperature (C)', type=float)
-    pressure = click.prompt('Pressure (kPa)', type=float)
-    
+
     try:
-        calc = PropertyCalculator(fluid)
-        props = calc.get_properties(temp=temp, pressure=pressure)
-        
-        table = []
-        for key, value in props.items():
-            if value is not None:
-                if isinstance(value, float):
-                    table.append([key.replace('_', ' ').title(), f"{value:.4f}"])
-        
-        click.echo(f"\nResults for {fluid.upper()}:")
-        click.echo(tabulate(table, headers=['Property', 'Value'], tablefmt='grid'))
-        
-    except Exception as e:
+        if input_csv is not None:
+            data = np.loadtxt(input_csv, delimiter=',', ndmin=2)
+            if data.shape[1] != 2:
+                raise ValueError("Input CSV must have two columns: temperature (C), pressure (kPa)")
+            temps, pressures = data[:, 0], data[:, 1]
+        else:
+            # Collect any number of states, then evaluate them in one
+            # vectorized call instead of one CoolProp round-trip each
+            temps, pressures = [], []
+            click.echo('Enter states as "temperature (C), pressure (kPa)"; blank line to finish.')
+            while True:
+                entry = click.prompt('T,P', default='', show_default=False).strip()
+                if not entry:
+                    break
+                try:
+                    t, p = (float(v) for v in entry.split(','))
+                except ValueError:
+                    click.echo('Could not parse; expected e.g. 25,101.325', err=True)
+                    continue
+                temps.append(t)
+                pressures.append(p)
+            if not temps:
+                click.echo('No states entered.')
+                return
+
+        calc = get_calculator(fluid)
+        props = calc.get_properties_batch(temps, pressures)
+        table = _batch_table(props)
+
+        click.echo(f"\nResults for {calc.display_name} ({len(table)} states):")
+        click.echo(tabulate(table, headers=_BATCH_HEADERS, tablefmt='grid'))
+
+    except (ValueError, RuntimeError) as e:
         click.echo(f"Error: {str(e)}", err=True)
 
 if __name__ == '__main__':
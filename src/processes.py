@@ -1,15 +1,70 @@
 """
 Thermodynamic process calculations.
 """
-from src.properties import PropertyCalculator
+from src.properties import get_calculator
 from typing import Dict
+from concurrent.futures import ThreadPoolExecutor
 import math
+import os
+import CoolProp
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional; fall back to plain Python
+    prange = range
+
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+@njit(cache=True, fastmath=True)
+def _polytropic_T(P_ratio, exponent, T1_K):
+    """Outlet temperature (K) of an ideal-gas polytropic process.
+
+    exponent is the precomputed (n - 1) / n, so callers evaluating many
+    states pay for the division once.
+    """
+    return T1_K * P_ratio ** exponent
+
+@njit(cache=True, fastmath=True)
+def _polytropic_work(P1, v1, v2, n, P_ratio):
+    """Polytropic work (same units as P1*v1); isothermal when n ~ 1."""
+    if abs(n - 1.0) < 0.001:
+        return P1 * v1 * math.log(P_ratio)
+    return (n / (n - 1.0)) * P1 * (P_ratio * v2 - v1)
+
+@njit(cache=True, fastmath=True)
+def _isochoric_pressure(P1, T1_K, T2_K):
+    """Outlet pressure of an ideal-gas constant-volume process."""
+    return P1 * T2_K / T1_K
+
+@njit(parallel=True, cache=True, fastmath=True)
+def _polytropic_outlet_temps(T1_K, P1, P2, n):
+    """Vector of polytropic outlet temperatures (K) over inlet arrays."""
+    exponent = (n - 1.0) / n
+    out = np.empty_like(T1_K)
+    for i in prange(T1_K.shape[0]):
+        out[i] = _polytropic_T(P2[i] / P1[i], exponent, T1_K[i])
+    return out
+
+# With numba present, the first call into each kernel pays JIT compile
+# latency unless the on-disk cache (cache=True) is already warm. Setting
+# THERMO_WARM_JIT=1 forces compilation at import; scripts/warm_jit.py
+# does this once at install time.
+if os.environ.get('THERMO_WARM_JIT', '0') == '1':
+    _polytropic_T(8.0, 0.3 / 1.3, 298.15)
+    _polytropic_work(100.0, 1.0, 0.5, 1.3, 8.0)
+    _isochoric_pressure(100.0, 298.15, 398.15)
+    _polytropic_outlet_temps(np.array([298.15]), np.array([100.0]),
+                             np.array([800.0]), 1.3)
 
 class ProcessAnalyzer:
     """Analyze various thermodynamic processes."""
-    
+
     def __init__(self, fluid: str):
-        self.calc = PropertyCalculator(fluid)
+        self.calc = get_calculator(fluid)
         self.fluid = fluid
     
     def isentropic_process(self, inlet_temp: float, inlet_pressure: float,
@@ -25,43 +80,99 @@ class ProcessAnalyzer:
             efficiency: Isentropic efficiency (0-1)
             process_type: 'compression' or 'expansion'
         """
-        # Get inlet properties
-        inlet = self.calc.get_properties(temp=inlet_temp, pressure=inlet_pressure)
-        
-        # Isentropic outlet (same entropy)
-        outlet_s = self.calc.get_properties(pressure=outlet_pressure, entropy=inlet['entropy'])
-        
+        # All intermediate arithmetic stays in SI (J/kg, Pa); dicts are
+        # converted to display units once on return
+        inlet = self.calc._get_properties_SI(temp=inlet_temp, pressure=inlet_pressure)
+
+        # Isentropic outlet (same entropy); flash the aux state directly
+        # instead of round-tripping through get_properties
+        P_out = outlet_pressure * 1000
+        outlet_s = self.calc.flash_aux(CoolProp.PSmass_INPUTS,
+                                       P_out, inlet['entropy'])
+
         # Actual outlet accounting for efficiency
         if process_type == 'compression':
             h_actual = inlet['enthalpy'] + (outlet_s['enthalpy'] - inlet['enthalpy']) / efficiency
         else:  # expansion
             h_actual = inlet['enthalpy'] - (inlet['enthalpy'] - outlet_s['enthalpy']) * efficiency
-        
-        outlet_actual = self.calc.get_properties(pressure=outlet_pressure, enthalpy=h_actual)
-        
+
+        outlet_actual = self.calc.flash_aux(CoolProp.HmassP_INPUTS, h_actual, P_out)
+
         # Calculate work
-        work = outlet_actual['enthalpy'] - inlet['enthalpy']  # kJ/kg
-        
+        work = (outlet_actual['enthalpy'] - inlet['enthalpy']) / 1000  # kJ/kg
+
         return {
-            'inlet': inlet,
-            'outlet_isentropic': outlet_s,
-            'outlet_actual': outlet_actual,
+            'inlet': self.calc.to_display(inlet),
+            'outlet_isentropic': self.calc.to_display(outlet_s),
+            'outlet_actual': self.calc.to_display(outlet_actual),
             'work': work,
             'efficiency': efficiency,
             'process_type': process_type
         }
     
+    def isentropic_batch(self, inlet_temps, inlet_pressures, outlet_pressures,
+                        efficiencies=1.0, process_type: str = 'compression') -> Dict:
+        """
+        Isentropic analysis over arrays of inlet conditions.
+
+        Splits the batch across a thread pool; CoolProp releases the GIL
+        during update(), so the three flashes per element run concurrently.
+        Each worker flashes on its own AbstractState (the instance states
+        are not thread-safe). Returns a dict of NumPy arrays.
+        """
+        T1 = np.asarray(inlet_temps, dtype=np.float64) + 273.15
+        P1 = np.asarray(inlet_pressures, dtype=np.float64) * 1000
+        P2 = np.asarray(outlet_pressures, dtype=np.float64) * 1000
+        if not (T1.shape == P1.shape == P2.shape):
+            raise ValueError("Inlet/outlet arrays must have the same shape")
+        eff = np.broadcast_to(np.asarray(efficiencies, dtype=np.float64), T1.shape)
+        compression = process_type == 'compression'
+
+        n = T1.shape[0]
+        work = np.empty(n)
+        T_out = np.empty(n)
+        T_out_s = np.empty(n)
+
+        def run(indices):
+            state = self.calc.new_state()
+            for i in indices:
+                state.update(CoolProp.PT_INPUTS, P1[i], T1[i])
+                h_in = state.hmass()
+                s_in = state.smass()
+                state.update(CoolProp.PSmass_INPUTS, P2[i], s_in)
+                h_s = state.hmass()
+                T_out_s[i] = state.T()
+                if compression:
+                    h_actual = h_in + (h_s - h_in) / eff[i]
+                else:
+                    h_actual = h_in - (h_in - h_s) * eff[i]
+                state.update(CoolProp.HmassP_INPUTS, h_actual, P2[i])
+                work[i] = (h_actual - h_in) / 1000  # kJ/kg
+                T_out[i] = state.T()
+
+        workers = min(os.cpu_count() or 1, n) or 1
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            # consume the map to propagate worker exceptions
+            list(pool.map(run, np.array_split(np.arange(n), workers)))
+
+        return {
+            'work': work,
+            'outlet_temperature': T_out - 273.15,
+            'outlet_temperature_isentropic': T_out_s - 273.15,
+            'process_type': process_type
+        }
+
     def isobaric_process(self, inlet_temp: float, pressure: float,
                         outlet_temp: float) -> Dict:
         """Constant pressure heating/cooling process."""
-        inlet = self.calc.get_properties(temp=inlet_temp, pressure=pressure)
-        outlet = self.calc.get_properties(temp=outlet_temp, pressure=pressure)
-        
-        heat = outlet['enthalpy'] - inlet['enthalpy']  # kJ/kg
-        
+        inlet = self.calc._get_properties_SI(temp=inlet_temp, pressure=pressure)
+        outlet = self.calc._get_properties_SI(temp=outlet_temp, pressure=pressure)
+
+        heat = (outlet['enthalpy'] - inlet['enthalpy']) / 1000  # kJ/kg
+
         return {
-            'inlet': inlet,
-            'outlet': outlet,
+            'inlet': self.calc.to_display(inlet),
+            'outlet': self.calc.to_display(outlet),
             'heat_transfer': heat,
             'pressure': pressure
         }
@@ -69,18 +180,20 @@ class ProcessAnalyzer:
     def isochoric_process(self, inlet_temp: float, inlet_pressure: float,
                          outlet_temp: float) -> Dict:
         """Constant volume heating/cooling process."""
-        inlet = self.calc.get_properties(temp=inlet_temp, pressure=inlet_pressure)
-        
+        inlet = self.calc._get_properties_SI(temp=inlet_temp, pressure=inlet_pressure)
+
         # For constant volume, find outlet pressure
         # This is approximate for real gases
-        outlet_pressure = inlet_pressure * (outlet_temp + 273.15) / (inlet_temp + 273.15)
-        outlet = self.calc.get_properties(temp=outlet_temp, pressure=outlet_pressure)
-        
-        heat = outlet['internal_energy'] - inlet['internal_energy']
-        
+        outlet_pressure = _isochoric_pressure(inlet_pressure,
+                                              inlet_temp + 273.15,
+                                              outlet_temp + 273.15)
+        outlet = self.calc._get_properties_SI(temp=outlet_temp, pressure=outlet_pressure)
+
+        heat = (outlet['internal_energy'] - inlet['internal_energy']) / 1000  # kJ/kg
+
         return {
-            'inlet': inlet,
-            'outlet': outlet,
+            'inlet': self.calc.to_display(inlet),
+            'outlet': self.calc.to_display(outlet),
             'heat_transfer': heat,
             'specific_volume': inlet['specific_volume']
         }
@@ -88,18 +201,19 @@ class ProcessAnalyzer:
     def throttling_process(self, inlet_temp: float, inlet_pressure: float,
                           outlet_pressure: float) -> Dict:
         """Isenthalpic throttling process (valve, expansion device)."""
-        inlet = self.calc.get_properties(temp=inlet_temp, pressure=inlet_pressure)
-        
+        inlet = self.calc._get_properties_SI(temp=inlet_temp, pressure=inlet_pressure)
+
         # Constant enthalpy
-        outlet = self.calc.get_properties(pressure=outlet_pressure, enthalpy=inlet['enthalpy'])
-        
+        outlet = self.calc.flash_aux(CoolProp.HmassP_INPUTS,
+                                     inlet['enthalpy'], outlet_pressure * 1000)
+
         temp_drop = inlet['temperature'] - outlet['temperature']
-        
+
         return {
-            'inlet': inlet,
-            'outlet': outlet,
+            'inlet': self.calc.to_display(inlet),
+            'outlet': self.calc.to_display(outlet),
             'temperature_drop': temp_drop,
-            'enthalpy': inlet['enthalpy']
+            'enthalpy': inlet['enthalpy'] / 1000
         }
     
     def polytropic_process(self, inlet_temp: float, inlet_pressure: float,
@@ -110,22 +224,51 @@ class ProcessAnalyzer:
         Args:
             n: Polytropic index (1=isothermal, k=isentropic)
         """
-        inlet = self.calc.get_properties(temp=inlet_temp, pressure=inlet_pressure)
-        
-        # For ideal gas approximation
-        T_ratio = (outlet_pressure / inlet_pressure) ** ((n - 1) / n)
-        outlet_temp = (inlet_temp + 273.15) * T_ratio - 273.15
-        
-        outlet = self.calc.get_properties(temp=outlet_temp, pressure=outlet_pressure)
-        
-        # Work calculation (approximate)
+        inlet = self.calc._get_properties_SI(temp=inlet_temp, pressure=inlet_pressure)
+
+        # For ideal gas approximation; hoist the shared pressure ratio and
+        # polytropic exponent so each is computed once
+        pr = outlet_pressure / inlet_pressure
+        outlet_temp = _polytropic_T(pr, (n - 1.0) / n, inlet_temp + 273.15) - 273.15
+
+        outlet = self.calc._get_properties_SI(temp=outlet_temp, pressure=outlet_pressure)
+
+        # Work calculation (approximate, kPa * m3/kg = kJ/kg)
+        work = _polytropic_work(inlet_pressure, inlet['specific_volume'],
+                                outlet['specific_volume'], n, pr)
+
+        return {
+            'inlet': self.calc.to_display(inlet),
+            'outlet': self.calc.to_display(outlet),
+            'work': work,
+            'polytropic_index': n
+        }
+
+    def polytropic_batch(self, inlet_temps, inlet_pressures,
+                        outlet_pressures, n: float) -> Dict:
+        """
+        Polytropic analysis over arrays of inlet conditions.
+
+        Outlet temperatures come from the JIT-compiled kernel (parallel
+        over elements when numba is present); property lookups go through
+        the vectorized batch API.
+        """
+        T1 = np.asarray(inlet_temps, dtype=np.float64)
+        P1 = np.asarray(inlet_pressures, dtype=np.float64)
+        P2 = np.asarray(outlet_pressures, dtype=np.float64)
+
+        T2 = _polytropic_outlet_temps(T1 + 273.15, P1, P2, n) - 273.15
+
+        inlet = self.calc.get_properties_batch(T1, P1)
+        outlet = self.calc.get_properties_batch(T2, P2)
+
         if abs(n - 1.0) < 0.001:
-            # Isothermal
-            work = inlet_pressure * inlet['specific_volume'] * math.log(outlet_pressure / inlet_pressure)
+            work = P1 * inlet['specific_volume'] * np.log(P2 / P1)
         else:
-            work = (n / (n - 1)) * (outlet_pressure * outlet['specific_volume'] - 
-                                   inlet_pressure * inlet['specific_volume'])
-        
+            coeff = n / (n - 1.0)
+            work = coeff * (P2 * outlet['specific_volume'] -
+                            P1 * inlet['specific_volume'])
+
         return {
             'inlet': inlet,
             'outlet': outlet,
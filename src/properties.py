@@ -1,94 +1,318 @@
 """
 Thermodynamic property calculations using CoolProp.
 """
-import CoolProp.CoolProp as CP
+import functools
+import os
+import textwrap
+import numpy as np
+from types import MappingProxyType
 from typing import Dict, Optional
 
+@functools.lru_cache(maxsize=None)
+def _coolprop():
+    """
+    Import CoolProp on first use and return (CoolProp, CoolProp.CoolProp).
+
+    The import costs hundreds of ms (shared-library load, fluid
+    registration), which would otherwise dominate cold CLI start for
+    commands that never touch it. Also pins the interpolation-table
+    cache so BICUBIC tables are built once and reused across runs.
+    """
+    import CoolProp
+    import CoolProp.CoolProp as CP
+    tables_dir = os.path.join(os.path.expanduser('~'), '.cache',
+                              'thermo-calculator', 'coolprop-tables')
+    os.makedirs(tables_dir, exist_ok=True)
+    CP.set_config_string(CP.ALTERNATIVE_TABLES_DIRECTORY, tables_dir)
+    return CoolProp, CP
+
+# Kwarg combinations accepted by get_properties. The CLI validates
+# against this before entering CoolProp (keep in sync with _input_pairs).
+SUPPORTED_INPUT_SETS = (
+    frozenset(('temp', 'pressure')),
+    frozenset(('temp', 'quality')),
+    frozenset(('pressure', 'enthalpy')),
+    frozenset(('pressure', 'entropy')),
+    frozenset(('enthalpy', 'entropy')),
+)
+
+@functools.lru_cache(maxsize=None)
+def _input_pairs():
+    """
+    Input-pair dispatch table: each supported kwarg combination maps to
+    the CoolProp input pair and the two unit-converting value expressions
+    (source strings over 'kw', in the argument order update() expects).
+    _make_getter compiles them into specialized flash functions. Built
+    lazily because the pair constants live in CoolProp.
+    """
+    CoolProp, _ = _coolprop()
+    return {
+        frozenset(('temp', 'pressure')): (
+            CoolProp.PT_INPUTS,
+            "float(kw['pressure']) * 1000.0",  # kPa -> Pa
+            "float(kw['temp']) + 273.15"),     # C -> K
+        frozenset(('temp', 'quality')): (
+            CoolProp.QT_INPUTS,
+            "float(kw['quality'])",
+            "float(kw['temp']) + 273.15"),
+        frozenset(('pressure', 'enthalpy')): (
+            CoolProp.HmassP_INPUTS,
+            "float(kw['enthalpy']) * 1000.0",  # kJ/kg -> J/kg
+            "float(kw['pressure']) * 1000.0"),
+        frozenset(('pressure', 'entropy')): (
+            CoolProp.PSmass_INPUTS,
+            "float(kw['pressure']) * 1000.0",
+            "float(kw['entropy']) * 1000.0"),
+        frozenset(('enthalpy', 'entropy')): (
+            CoolProp.HmassSmass_INPUTS,
+            "float(kw['enthalpy']) * 1000.0",
+            "float(kw['entropy']) * 1000.0"),
+    }
+
+@functools.lru_cache(maxsize=None)
+def _make_getter(key: frozenset):
+    """
+    Compile a flash function specialized for one input-key set.
+
+    The generated source hardcodes the CoolProp input-pair constant and
+    the unit-conversion expressions, so the per-call path has no table
+    lookup or branching left. The getter takes (calculator, kwargs) and
+    keeps the tabular-to-HEOS retry of the generic path. Raises KeyError
+    for unsupported key sets.
+    """
+    pair, expr1, expr2 = _input_pairs()[key]
+    src = textwrap.dedent(f"""
+        def _getter(calc, kw):
+            state = calc._state
+            try:
+                state.update({pair}, {expr1}, {expr2})
+            except ValueError:
+                if state is calc._heos:
+                    raise
+                state = calc._heos_state()
+                state.update({pair}, {expr1}, {expr2})
+            return calc._read_state(state)
+    """)
+    namespace = {}
+    exec(src, namespace)
+    return namespace['_getter']
+
 class PropertyCalculator:
     """Calculate thermodynamic properties for various fluids."""
     
+    # CLI key -> (CoolProp name, display name), both precomputed so the
+    # hot paths never re-case fluid strings
     FLUID_MAP = {
-        'water': 'Water',
-        'air': 'Air',
-        'r134a': 'R134a',
-        'r22': 'R22',
-        'co2': 'CO2'
+        'water': ('Water', 'WATER'),
+        'air': ('Air', 'AIR'),
+        'r134a': ('R134a', 'R134A'),
+        'r22': ('R22', 'R22'),
+        'co2': ('CO2', 'CO2')
     }
-    
+
+    # Fluids with precomputed bicubic interpolation tables; flashes become
+    # a table lookup instead of a full Helmholtz EOS solve. Air (pseudo-pure)
+    # stays on HEOS.
+    TABULAR_FLUIDS = {'Water', 'CO2', 'R134a', 'R22'}
+
+    # Output dtype for get_properties_batch. float32 halves the memory
+    # footprint of large batches and still carries ~7 significant digits,
+    # more than the CLI ever displays; set to np.float32 where that is
+    # enough. Scalar get_properties always returns float64.
+    dtype = np.float64
+
     def __init__(self, fluid: str):
         """Initialize calculator for a specific fluid."""
         if fluid.lower() not in self.FLUID_MAP:
             raise ValueError(f"Unsupported fluid: {fluid}")
-        self.fluid = self.FLUID_MAP[fluid.lower()]
+        self._key = fluid.lower()
+        self.fluid, self.display_name = self.FLUID_MAP[self._key]
+        _, CP = _coolprop()
+        # One reusable low-level state: a single flash exposes every
+        # property, instead of one PropsSI call (and one flash) per output.
+        # Prefer the tabular backend where tables exist (first use builds
+        # them, later runs load from the pinned cache directory).
+        self.backend = 'HEOS'
+        if self.fluid in self.TABULAR_FLUIDS:
+            try:
+                self._state = CP.AbstractState('BICUBIC&HEOS', self.fluid)
+                self.backend = 'BICUBIC&HEOS'
+            except Exception:
+                self._state = CP.AbstractState('HEOS', self.fluid)
+        else:
+            self._state = CP.AbstractState('HEOS', self.fluid)
+        # Lazily-built HEOS state for input pairs the tabular backend
+        # rejects (e.g. enthalpy+entropy)
+        self._heos = self._state if self.backend == 'HEOS' else None
+        # Secondary state for outlet flashes, so process analysis can
+        # compute an outlet without clobbering the converged inlet state
+        self._state_aux = None
+
+    def new_state(self):
+        """
+        Construct a fresh AbstractState on this calculator's backend.
+
+        The states cached on the instance are single-thread only; workers
+        that flash concurrently should each take their own state from here.
+        """
+        _, CP = _coolprop()
+        return CP.AbstractState(self.backend, self.fluid)
+
+    def _heos_state(self):
+        """Full-EOS fallback state for flashes the tabular backend lacks."""
+        if self._heos is None:
+            _, CP = _coolprop()
+            self._heos = CP.AbstractState('HEOS', self.fluid)
+        return self._heos
     
     def get_properties(self, **kwargs) -> Dict[str, float]:
         """
         Get thermodynamic properties given two independent properties.
-        
+
         Supported input combinations:
         - temp + pressure
         - temp + quality (for two-phase)
         - pressure + enthalpy
         - pressure + entropy
         - enthalpy + entropy
+
+        Results are memoized on the (rounded) inputs, so re-evaluating the
+        same state skips the CoolProp flash entirely.
+        """
+        return self.to_display(self._get_properties_SI(**kwargs))
+
+    def _get_properties_SI(self, **kwargs) -> Dict[str, float]:
+        """
+        Like get_properties, but returns SI units (K, Pa, J/kg, J/kg-K).
+
+        Internal callers (process analysis) stay in SI end to end and
+        convert once at the boundary via to_display.
         """
         try:
-            # Convert inputs and determine state
-            if 'temp' in kwargs and 'pressure' in kwargs:
-                T = float(kwargs['temp']) + 273.15  # Convert C to K
-                P = float(kwargs['pressure']) * 1000  # Convert kPa to Pa
-                
-            elif 'temp' in kwargs and 'quality' in kwargs:
-                T = float(kwargs['temp']) + 273.15
-                Q = float(kwargs['quality'])
-                P = CP.PropsSI('P', 'T', T, 'Q', Q, self.fluid)
-                
-            elif 'pressure' in kwargs and 'enthalpy' in kwargs:
-                P = float(kwargs['pressure']) * 1000
-                H = float(kwargs['enthalpy']) * 1000  # kJ/kg to J/kg
-                T = CP.PropsSI('T', 'P', P, 'H', H, self.fluid)
-                
-            elif 'pressure' in kwargs and 'entropy' in kwargs:
-                P = float(kwargs['pressure']) * 1000
-                S = float(kwargs['entropy']) * 1000
-                T = CP.PropsSI('T', 'P', P, 'S', S, self.fluid)
-                
-            elif 'enthalpy' in kwargs and 'entropy' in kwargs:
-                H = float(kwargs['enthalpy']) * 1000
-                S = float(kwargs['entropy']) * 1000
-                T = CP.PropsSI('T', 'H', H, 'S', S, self.fluid)
-                P = CP.PropsSI('P', 'H', H, 'S', S, self.fluid)
-            else:
-                raise ValueError("Must provide two independent properties (temp+pressure, temp+quality, etc.)")
-            
-            # Calculate all properties using the determined T and P
-            props = {}
-            props['temperature'] = T - 273.15
-            props['pressure'] = P / 1000
-            props['enthalpy'] = CP.PropsSI('H', 'T', T, 'P', P, self.fluid) / 1000
-            props['entropy'] = CP.PropsSI('S', 'T', T, 'P', P, self.fluid) / 1000
-            props['density'] = CP.PropsSI('D', 'T', T, 'P', P, self.fluid)
-            props['specific_volume'] = 1.0 / props['density']
-            props['internal_energy'] = CP.PropsSI('U', 'T', T, 'P', P, self.fluid) / 1000
-            
-            # Try to get quality (will be -1 for single phase)
+            key = tuple(sorted((name, round(float(value), 9))
+                               for name, value in kwargs.items()))
+        except (TypeError, ValueError):
+            raise ValueError("Property inputs must be numeric")
+        return dict(_cached_properties(self._key, key))
+
+    @staticmethod
+    def to_display(props: Dict[str, float]) -> Dict[str, float]:
+        """Convert an SI property dict to display units (C, kPa, kJ/kg)."""
+        out = dict(props)
+        out['temperature'] = props['temperature'] - 273.15
+        out['pressure'] = props['pressure'] / 1000
+        out['enthalpy'] = props['enthalpy'] / 1000
+        out['entropy'] = props['entropy'] / 1000
+        out['internal_energy'] = props['internal_energy'] / 1000
+        return out
+
+    def _compute_properties(self, kwargs: Dict[str, float]) -> Dict[str, float]:
+        """Run the actual flash (uncached path); returns SI units."""
+        try:
+            # Dispatch to a flash function compiled for this key set; the
+            # generated code inlines the input pair and unit conversions.
+            key = frozenset(k for k, v in kwargs.items() if v is not None)
             try:
-                quality = CP.PropsSI('Q', 'T', T, 'P', P, self.fluid)
-                if 0 <= quality <= 1:
-                    props['quality'] = quality
-                else:
-                    props['quality'] = None
-            except:
+                getter = _make_getter(key)
+            except KeyError:
+                raise ValueError("Must provide two independent properties (temp+pressure, temp+quality, etc.)")
+            return getter(self, kwargs)
+
+        except Exception as e:
+            raise ValueError(f"Error calculating properties: {str(e)}")
+
+    @staticmethod
+    def _read_state(state) -> Dict[str, float]:
+        """Pack the SI property dict from a converged AbstractState."""
+        props = {}
+        props['temperature'] = state.T()
+        props['pressure'] = state.p()
+        props['enthalpy'] = state.hmass()
+        props['entropy'] = state.smass()
+        rho = state.rhomass()
+        props['density'] = rho
+        props['specific_volume'] = 1.0 / rho
+        props['internal_energy'] = state.umass()
+
+        # Try to get quality (will be -1 for single phase)
+        try:
+            quality = state.Q()
+            if 0 <= quality <= 1:
+                props['quality'] = quality
+            else:
                 props['quality'] = None
-            
-            return props
-            
+        except:
+            props['quality'] = None
+
+        return props
+
+    def flash_aux(self, input_pair: int, val1: float, val2: float) -> Dict[str, float]:
+        """
+        Flash SI-unit inputs on the secondary state; returns SI properties.
+
+        Process analysis uses this for outlet states: it skips the kwargs
+        parsing and unit conversion of get_properties and leaves the
+        primary (inlet) state untouched.
+        """
+        if self._state_aux is None:
+            _, CP = _coolprop()
+            self._state_aux = CP.AbstractState(self.backend, self.fluid)
+        try:
+            self._state_aux.update(input_pair, val1, val2)
         except Exception as e:
             raise ValueError(f"Error calculating properties: {str(e)}")
+        return self._read_state(self._state_aux)
     
-    def get_saturation_properties(self, temp: Optional[float] = None, 
+    def get_properties_batch(self, temps, pressures) -> Dict[str, np.ndarray]:
+        """
+        Evaluate properties for arrays of temperature (C) and pressure (kPa).
+
+        Uses CoolProp's vectorized PropsSImulti entry point, so the loop
+        over states runs in C++ with one Python call for the whole batch.
+
+        Returns a dict of NumPy arrays keyed like get_properties
+        (struct-of-arrays): each property is one contiguous unit-stride
+        array, so downstream NumPy code vectorizes over it directly
+        instead of walking a list of per-state dicts. Arrays use the
+        class-level dtype (float64 by default, float32 opt-in).
+        """
+        T = np.asarray(temps, dtype=np.float64) + 273.15
+        P = np.asarray(pressures, dtype=np.float64) * 1000.0
+        if T.shape != P.shape:
+            raise ValueError("Temperature and pressure arrays must have the same shape")
+
+        _, CP = _coolprop()
+        outputs = ['H', 'S', 'D', 'U']
+        # PropsSImulti signals failure with an empty result; the tabular
+        # backend does not support it, so fall back to HEOS.
+        raw = CP.PropsSImulti(outputs, 'T', T, 'P', P, self.backend, [self.fluid], [])
+        if len(raw) == 0 and self.backend != 'HEOS':
+            raw = CP.PropsSImulti(outputs, 'T', T, 'P', P, 'HEOS', [self.fluid], [])
+        if len(raw) == 0:
+            raise ValueError("Error calculating batch properties (check input ranges)")
+        raw = np.asarray(raw)
+
+        # Column slices of the row-major result are strided; copy each
+        # into its own contiguous array so per-property access is
+        # unit-stride (the arithmetic below already does this for most)
+        density = np.ascontiguousarray(raw[:, 2])
+        props = {
+            'temperature': T - 273.15,
+            'pressure': P / 1000.0,
+            'enthalpy': raw[:, 0] / 1000.0,
+            'entropy': raw[:, 1] / 1000.0,
+            'density': density,
+            'specific_volume': 1.0 / density,
+            'internal_energy': raw[:, 3] / 1000.0,
+        }
+        if self.dtype is not np.float64:
+            props = {k: np.asarray(v, dtype=self.dtype) for k, v in props.items()}
+        return props
+
+    def get_saturation_properties(self, temp: Optional[float] = None,
                                   pressure: Optional[float] = None) -> Dict[str, float]:
         """Get saturation properties at given temperature or pressure."""
+        _, CP = _coolprop()
         if temp is not None:
             T = float(temp) + 273.15
             P = CP.PropsSI('P', 'T', T, 'Q', 0, self.fluid)
@@ -117,3 +341,24 @@ class PropertyCalculator:
         props['s_fg'] = props['s_g'] - props['s_f']
         
         return props
+
+@functools.lru_cache(maxsize=4096)
+def _cached_properties(fluid: str, key: tuple) -> MappingProxyType:
+    """Memoized flash keyed by (fluid, sorted rounded inputs).
+
+    Returns a read-only mapping so cached results cannot be mutated;
+    get_properties hands callers a fresh dict copy.
+    """
+    return MappingProxyType(get_calculator(fluid)._compute_properties(dict(key)))
+
+@functools.lru_cache(maxsize=None)
+def get_calculator(fluid: str) -> PropertyCalculator:
+    """
+    Return a shared PropertyCalculator for the given fluid.
+
+    Backend construction (and the one-time table load for tabular fluids)
+    happens once per fluid; repeated calls reuse the same AbstractState.
+    The cached instances are not thread-safe - callers that need
+    concurrency should construct PropertyCalculator directly per thread.
+    """
+    return PropertyCalculator(fluid.lower())